@@ -1,37 +1,40 @@
 #!/usr/bin/env python3
 """
 Script simple et robuste pour importer les données des cinémas parisiens.
-Usage: python import_paris.py [--days 7] [--test]
+Usage: python import_paris.py [--days 7] [--test] [--workers 2]
 """
 import argparse
 import sys
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 # Add src to path
 sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
 
-from allocineAPI.allocineAPI import allocineAPI
-
 from db.insert_logic import (
     cinema_id_to_int,
     process_cinema_screenings,
 )
 from db.supabase_client import supabase
+from services.allocine import get_allocine_api
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 # Configuration
 PARIS_LOCATION_ID = "ville-115755"  # ID officiel d'Allocine pour Paris
+# Pause après chaque import, appliquée PAR worker: le débit vers Allocine
+# grandit avec --workers (et chaque import récupère déjà films + séances en parallèle)
 DELAY_BETWEEN_REQUESTS = 0.5  # secondes entre chaque requête
 MAX_RETRIES = 3
+MAX_WORKERS = 2  # couples cinéma/date importés en parallèle, prudent pour Allocine
 
 
 def get_paris_cinemas() -> list[dict]:
     """Récupère tous les cinémas de Paris depuis l'API."""
-    api = allocineAPI()
+    api = get_allocine_api()
 
     logger.info("Récupération des cinémas parisiens...")
     try:
@@ -132,9 +135,25 @@ def import_screenings_with_retry(
                 return 0, 0
 
 
+def positive_int(value: str) -> int:
+    """Type argparse: entier >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"doit être >= 1 (reçu {value})")
+    return number
+
+
+def import_screenings_paced(cinema_id: str, date: str) -> tuple:
+    """Importe les séances puis marque une pause, pour ménager l'API."""
+    result = import_screenings_with_retry(cinema_id, date)
+    # Pause entre les requêtes (par worker)
+    time.sleep(DELAY_BETWEEN_REQUESTS)
+    return result
+
+
 def clean_old_screenings(days_to_keep: int = 30):
     """Supprime les séances de plus de X jours."""
-    cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).strftime("%Y-%m-%d")
+    cutoff_date = (date.today() - timedelta(days=days_to_keep)).isoformat()
 
     try:
         supabase.table("screenings").delete().lt("date", cutoff_date).execute()
@@ -161,6 +180,16 @@ def main():
         "--clean-only", action="store_true", help="Nettoyer seulement, sans import"
     )
     parser.add_argument("--cinema", type=str, help="Importer un seul cinéma par son ID")
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=MAX_WORKERS,
+        help=(
+            f"Nombre d'imports en parallèle (défaut: {MAX_WORKERS}). La pause de "
+            f"{DELAY_BETWEEN_REQUESTS}s s'applique par worker: plus de workers = "
+            "plus de requêtes vers Allocine"
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -196,36 +225,33 @@ def main():
         cinema_ids = import_cinemas(cinemas)
 
     # Générer les dates
-    dates = [
-        (datetime.today() + timedelta(days=i)).strftime("%Y-%m-%d")
-        for i in range(args.days)
-    ]
+    today = date.today()
+    dates = [(today + timedelta(days=i)).isoformat() for i in range(args.days)]
 
     # Stats globales
     total_movies = 0
     total_screenings = 0
     failed_imports = []
 
-    # Importer les séances
-    total_operations = len(cinema_ids) * len(dates)
-    current_op = 0
+    # Importer les séances, plusieurs couples cinéma/date en parallèle
+    jobs = [(cinema_id, date_str) for cinema_id in cinema_ids for date_str in dates]
+    total_operations = len(jobs)
 
-    for cinema_id in cinema_ids:
-        for date in dates:
-            current_op += 1
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = executor.map(lambda job: import_screenings_paced(*job), jobs)
+
+        for current_op, ((cinema_id, date_str), (movies, screenings)) in enumerate(
+            zip(jobs, results, strict=True), start=1
+        ):
             logger.info(
-                f"Import {current_op}/{total_operations}: Cinéma {cinema_id} pour le {date}"
+                f"Import {current_op}/{total_operations}: Cinéma {cinema_id} pour le {date_str}"
             )
 
-            movies, screenings = import_screenings_with_retry(cinema_id, date)
             total_movies += movies
             total_screenings += screenings
 
             if movies == 0 and screenings == 0:
-                failed_imports.append((cinema_id, date))
-
-            # Pause entre les requêtes
-            time.sleep(DELAY_BETWEEN_REQUESTS)
+                failed_imports.append((cinema_id, date_str))
 
     # Rapport final
     duration = datetime.now() - start_time
@@ -238,8 +264,8 @@ def main():
 
     if failed_imports:
         logger.warning(f"Échecs d'import: {len(failed_imports)}")
-        for cinema_id, date in failed_imports[:10]:  # Limiter l'affichage
-            logger.warning(f"  - {cinema_id} le {date}")
+        for cinema_id, date_str in failed_imports[:10]:  # Limiter l'affichage
+            logger.warning(f"  - {cinema_id} le {date_str}")
 
     # Stats moyennes
     if cinema_ids and args.days > 0:
@@ -13,10 +13,9 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
 
-from allocineAPI.allocineAPI import allocineAPI
-
 from db.insert_logic import cinema_id_to_int, generate_circuit_id
 from db.supabase_client import supabase
+from services.allocine import get_allocine_api
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -32,7 +31,7 @@ def fetch_all_circuits() -> dict[str, dict]:
     Returns:
         Dict mapping circuit_code -> {id, name, code}
     """
-    api = allocineAPI()
+    api = get_allocine_api()
     circuits_map = {}
 
     try:
@@ -98,7 +97,7 @@ def map_cinemas_to_circuits(circuits_map: dict[str, dict]) -> dict[int, int]:
     Returns:
         Dict mapping cinema_id (BIGINT) -> circuit_id (INT)
     """
-    api = allocineAPI()
+    api = get_allocine_api()
     cinema_to_circuit = {}
 
     for circuit_code, circuit_info in circuits_map.items():
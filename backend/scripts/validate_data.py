@@ -5,7 +5,7 @@ Vérifie les doublons, les incohérences et génère un rapport détaillé.
 """
 import sys
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
@@ -77,10 +77,10 @@ class DataValidator:
 
         # Vérifier sur les 7 prochains jours
         duplicate_count = 0
-        today = datetime.now()
+        today = date.today()
 
         for days_offset in range(7):
-            check_date = (today + timedelta(days=days_offset)).strftime("%Y-%m-%d")
+            check_date = (today + timedelta(days=days_offset)).isoformat()
 
             try:
                 screenings = (
@@ -254,7 +254,7 @@ class DataValidator:
             )
 
         # Séances dans le passé
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
         old_screenings = (
             supabase.table("screenings")
             .select("count", count="exact")
@@ -271,7 +271,7 @@ class DataValidator:
             )
 
         # Séances trop loin dans le futur (>30 jours)
-        future_date = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
+        future_date = (date.today() + timedelta(days=30)).isoformat()
         future_screenings = (
             supabase.table("screenings")
             .select("count", count="exact")
@@ -6,6 +6,11 @@ Updated to support BIGINT for cinema IDs only.
 
 import hashlib
 import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from postgrest import ReturnMethod
 
 from models import Director, Language
 from utils.logger import get_logger
@@ -15,7 +20,15 @@ from .supabase_client import supabase
 logger = get_logger(__name__)
 
 # Batch size for bulk operations
-BATCH_SIZE = 100
+BATCH_SIZE = 500
+
+# Runtime patterns for strings outside the fast path, compiled once
+_RE_HOURS = re.compile(r"(\d+)h")
+_RE_MINUTES = re.compile(r"(\d+)min")
+
+# Films déjà écrits par ce process: un même film passe dans des dizaines de
+# cinémas et de dates, inutile de le renvoyer à Supabase à chaque fois
+_known_movie_ids: set[int] = set()
 
 
 def parse_runtime(runtime_str: str | None) -> int:
@@ -28,25 +41,40 @@ def parse_runtime(runtime_str: str | None) -> int:
     Returns:
         Runtime in minutes, 0 if invalid
     """
-    if not runtime_str:
-        return 0
-
     if isinstance(runtime_str, int):
         return runtime_str
 
+    if not runtime_str:
+        return 0
+
+    # Fast path for the exact Allocine shapes ("1h 56min", "2h", "96min")
+    hours_str, has_hours, minutes_str = runtime_str.strip().partition("h")
+    if not has_hours:
+        hours_str, minutes_str = "0", hours_str
+    minutes_str = minutes_str.strip() or "0min"
+    if minutes_str.endswith("min"):
+        minutes_str = minutes_str[:-3]
+        if hours_str.isdecimal() and minutes_str.isdecimal():
+            return int(hours_str) * 60 + int(minutes_str)
+
+    # Anything else ("Durée 1h 30min", "45minutes"...): first "<n>h" and first
+    # "<n>min" anywhere, as before (the runtime feeds generate_movie_id)
     hours = minutes = 0
 
-    # Extract hours
-    if match := re.search(r"(\d+)h", runtime_str):
+    if match := _RE_HOURS.search(runtime_str):
         hours = int(match.group(1))
 
-    # Extract minutes
-    if match := re.search(r"(\d+)min", runtime_str):
+    if match := _RE_MINUTES.search(runtime_str):
         minutes = int(match.group(1))
 
     return hours * 60 + minutes
 
 
+def _digest_to_id(digest: bytes) -> int:
+    """Turn a digest into an 8-digit ID (first 4 bytes, big-endian)."""
+    return int.from_bytes(digest[:4], "big") % 100_000_000
+
+
 def generate_movie_id(title: str, original_title: str, runtime: int = 0) -> int:
     """
     Generate stable unique ID for a movie.
@@ -59,34 +87,53 @@ def generate_movie_id(title: str, original_title: str, runtime: int = 0) -> int:
     Returns:
         8-digit movie ID
     """
-    # Normalize inputs
+    # Normalize inputs before the cached call so equivalent titles share an entry
     title = title.strip().lower()
     original_title = (original_title or title).strip().lower()
+    return _hash_movie_id(title, original_title, runtime)
+
 
-    # Build hash string
-    hash_str = f"{title}_{original_title}"
+@lru_cache(maxsize=100_000)
+def _hash_movie_id(title: str, original_title: str, runtime: int) -> int:
+    """Hash already normalized movie fields (same movie recurs across cinemas)."""
+    # Feed "title_original[_runtime]" piecewise, without building the joined string
+    hasher = hashlib.sha256(title.encode())
+    hasher.update(b"_")
+    hasher.update(original_title.encode())
     if runtime > 0:
-        hash_str += f"_{runtime}"
+        hasher.update(b"_")
+        hasher.update(str(runtime).encode())
 
     # Generate ID from hash - RETOUR À L'ORIGINAL
-    hash_bytes = hashlib.sha256(hash_str.encode()).digest()
-    return int.from_bytes(hash_bytes[:4], "big") % 100_000_000
+    return _digest_to_id(hasher.digest())
 
 
 def generate_director_id(first_name: str, last_name: str) -> int:
     """Generate stable unique ID for a director."""
-    full_name = f"{first_name.strip().lower()}_{last_name.strip().lower()}"
-    hash_bytes = hashlib.sha256(full_name.encode()).digest()
-    return int.from_bytes(hash_bytes[:4], "big") % 100_000_000
+    return _hash_director_id(first_name.strip().lower(), last_name.strip().lower())
+
+
+@lru_cache(maxsize=100_000)
+def _hash_director_id(first_name: str, last_name: str) -> int:
+    """Hash an already normalized director name ("first_last")."""
+    hasher = hashlib.sha256(first_name.encode())
+    hasher.update(b"_")
+    hasher.update(last_name.encode())
+    return _digest_to_id(hasher.digest())
 
 
 def generate_circuit_id(circuit_code: str) -> int:
     """Generate stable unique ID for a circuit within INT range."""
-    normalized = circuit_code.strip().lower()
-    hash_bytes = hashlib.sha256(normalized.encode()).digest()
-    return int.from_bytes(hash_bytes[:4], "big") % 100_000_000  # Comme avant
+    return _hash_circuit_id(circuit_code.strip().lower())
+
+
+@lru_cache(maxsize=4096)
+def _hash_circuit_id(circuit_code: str) -> int:
+    """Hash an already normalized circuit code."""
+    return _digest_to_id(hashlib.sha256(circuit_code.encode()).digest())  # Comme avant
 
 
+@lru_cache(maxsize=8192)
 def cinema_id_to_bigint(cinema_id: str) -> int:
     """
     Convert string cinema ID to BIGINT for database.
@@ -118,25 +165,24 @@ def cinema_id_to_bigint(cinema_id: str) -> int:
 cinema_id_to_int = cinema_id_to_bigint
 
 
-def parse_directors(director_str: str | None) -> list[Director]:
-    """Parse director string into Director objects."""
+def _iter_directors(director_str: str | None) -> Iterator[Director]:
+    """Yield Director objects from a director string, one name at a time."""
     if not director_str or director_str == "Unknown Director":
-        return []
+        return
 
-    directors = []
-    for full_name in director_str.split("|"):
-        full_name = full_name.strip()
-        if not full_name or " " not in full_name:
+    for name in director_str.split("|"):
+        name = name.strip()
+        # Skip names without a space (e.g. "Madonna")
+        if " " not in name:
             continue
 
-        parts = full_name.split(" ", 1)
-        try:
-            director = Director(first_name=parts[0], last_name=parts[1])
-            directors.append(director)
-        except Exception as e:
-            logger.warning("Invalid director name", name=full_name, error=str(e))
+        first_name, last_name = name.split(" ", 1)
+        yield Director(first_name=first_name, last_name=last_name.strip())
+
 
-    return directors
+def parse_directors(director_str: str | None) -> list[Director]:
+    """Parse director string into Director objects."""
+    return list(_iter_directors(director_str))
 
 
 def parse_languages(languages_data: list[dict] | None) -> list[Language]:
@@ -146,21 +192,16 @@ def parse_languages(languages_data: list[dict] | None) -> list[Language]:
 
     languages = []
     for lang_data in languages_data:
-        try:
-            if isinstance(lang_data, dict):
-                lang = Language(
-                    code=lang_data.get("code", ""), label=lang_data.get("label")
-                )
-            elif isinstance(lang_data, str):
-                lang = Language(code=lang_data, label=lang_data)
-            else:
-                continue
+        # Resolve code/label first so empty codes never build a Language
+        if isinstance(lang_data, str):
+            code, label = lang_data, lang_data
+        elif isinstance(lang_data, dict):
+            code, label = lang_data.get("code"), lang_data.get("label")
+        else:
+            continue
 
-            if lang.code:  # Only add if code is not empty
-                languages.append(lang)
-
-        except Exception as e:
-            logger.warning("Invalid language data", data=lang_data, error=str(e))
+        if code:  # Only add if code is not empty
+            languages.append(Language(code=code, label=label or code))
 
     return languages
 
@@ -185,19 +226,6 @@ def insert_cinema(cinema_data: dict, circuit_id: int | None = None) -> str | Non
         # Convert to BIGINT for database
         cinema_id_bigint = cinema_id_to_bigint(cinema_id_str)
 
-        # Check if exists
-        response = (
-            supabase.table("cinemas").select("id").eq("id", cinema_id_bigint).execute()
-        )
-        if len(response.data) > 0:
-            # Update circuit_id if provided and not already set
-            if circuit_id:
-                supabase.table("cinemas").update({"circuit_id": circuit_id}).eq(
-                    "id", cinema_id_bigint
-                ).execute()
-            logger.debug("Cinema already exists", cinema_id=cinema_id_str)
-            return cinema_id_str
-
         # Prepare data
         data = {
             "id": cinema_id_bigint,
@@ -211,8 +239,21 @@ def insert_cinema(cinema_data: dict, circuit_id: int | None = None) -> str | Non
         if circuit_id:
             data["circuit_id"] = circuit_id
 
-        # Insert
-        supabase.table("cinemas").insert(data).execute()
+        # Insert, or do nothing if it exists: only new rows are returned
+        response = (
+            supabase.table("cinemas")
+            .upsert(data, on_conflict="id", ignore_duplicates=True)
+            .execute()
+        )
+        if not response.data:
+            # Update circuit_id if provided and not already set
+            if circuit_id:
+                supabase.table("cinemas").update({"circuit_id": circuit_id}).eq(
+                    "id", cinema_id_bigint
+                ).execute()
+            logger.debug("Cinema already exists", cinema_id=cinema_id_str)
+            return cinema_id_str
+
         logger.info(
             "Inserted cinema",
             name=data["name"],
@@ -259,23 +300,127 @@ def insert_release(movie_id: int, release_data: dict) -> bool:
         return False
 
 
-def bulk_insert_movies(movies_data: list[dict]) -> tuple[int, set[int]]:
+def _build_director_rows(
+    movie_id: int, director_str: str | None
+) -> tuple[list[dict], list[dict]]:
+    """
+    Build the rows for one movie's directors.
+
+    Returns:
+        Tuple (directors rows, movie_directors links)
+    """
+    director_rows = []
+    links = []
+    for director in _iter_directors(director_str):
+        director_id = generate_director_id(director.first_name, director.last_name)
+        director_rows.append(
+            {
+                "id": director_id,
+                "first_name": director.first_name,
+                "last_name": director.last_name,
+            }
+        )
+        links.append({"movie_id": movie_id, "director_id": director_id})
+
+    return director_rows, links
+
+
+def _build_language_rows(
+    movie_id: int, languages_data: list[dict | str] | None
+) -> tuple[list[dict], list[dict]]:
+    """
+    Build the rows for one movie's languages.
+
+    Returns:
+        Tuple (languages rows, movie_languages links)
+    """
+    language_rows = []
+    links = []
+    for lang in languages_data or []:
+        if isinstance(lang, dict):
+            code = lang.get("code", "")
+            label = lang.get("label", code)
+        elif isinstance(lang, str):
+            code = lang
+            label = lang
+        else:
+            continue
+
+        if code:
+            language_rows.append({"code": code, "label": label})
+            links.append({"movie_id": movie_id, "code": code})
+
+    return language_rows, links
+
+
+def _conflict_sort_key(row: dict, columns: list[str]) -> tuple:
+    """Sort key on the conflict columns (NULLs first, never compared to values)."""
+    return tuple((row[column] is not None, row[column]) for column in columns)
+
+
+def _upsert_in_batches(
+    table: str,
+    rows: list[dict],
+    on_conflict: str,
+    ignore_duplicates: bool = False,
+    returning: ReturnMethod = ReturnMethod.representation,
+) -> list[dict]:
+    """
+    Upsert rows into a table, BATCH_SIZE rows per request.
+
+    Args:
+        returning: ReturnMethod.minimal when the caller ignores the rows
+            (Supabase then sends back an empty body)
+
+    Returns:
+        Rows sent back by Supabase, all batches concatenated
+    """
+    # Plusieurs imports tournent en parallèle sur les mêmes clés (langues,
+    # réalisateurs...): toujours verrouiller les lignes dans le même ordre,
+    # sinon Postgres détecte un deadlock et annule l'un des upserts
+    columns = on_conflict.split(",")
+    rows = sorted(rows, key=lambda row: _conflict_sort_key(row, columns))
+
+    returned = []
+    for i in range(0, len(rows), BATCH_SIZE):
+        batch = rows[i : i + BATCH_SIZE]
+        result = (
+            supabase.table(table)
+            .upsert(
+                batch,
+                on_conflict=on_conflict,
+                ignore_duplicates=ignore_duplicates,
+                returning=returning,
+            )
+            .execute()
+        )
+        returned.extend(result.data)
+        logger.debug(f"Batch {table} {i//BATCH_SIZE + 1}: {len(batch)} lignes")
+
+    return returned
+
+
+def bulk_insert_movies(
+    movies_data: list[dict],
+) -> tuple[int, set[int], dict[str, int]]:
     """
     Insère plusieurs films en une seule opération.
 
     Returns:
-        Tuple (nombre de films insérés, set des movie_ids)
+        Tuple (nombre de films insérés, set des movie_ids, mapping titre -> movie_id)
     """
     if not movies_data:
-        return 0, set()
+        return 0, set(), {}
 
     # Préparer tous les films
     movies_to_insert = []
     movie_ids = set()
+    movie_title_to_id = {}
     directors_to_insert = {}  # key: director_id, value: director_data
     languages_to_insert = {}  # key: code, value: language_data
     movie_directors_links = []
     movie_languages_links = []
+    releases_to_insert = {}  # key: (movie_id, release_date), value: release_data
 
     for movie_data in movies_data:
         try:
@@ -286,8 +431,18 @@ def bulk_insert_movies(movies_data: list[dict]) -> tuple[int, set[int]]:
                 movie_data.get("originalTitle", movie_data["title"]),
                 runtime,
             )
+            movie_title_to_id[movie_data["title"]] = movie_id
+
+            # Même film listé deux fois: une ligne en double ferait échouer
+            # l'upsert (ON CONFLICT DO UPDATE ne touche pas deux fois une ligne)
+            if movie_id in movie_ids:
+                continue
             movie_ids.add(movie_id)
 
+            # Film, réalisateurs, langues et sortie déjà upsertés pendant ce run
+            if movie_id in _known_movie_ids:
+                continue
+
             # Préparer les données du film
             movies_to_insert.append(
                 {
@@ -310,37 +465,28 @@ def bulk_insert_movies(movies_data: list[dict]) -> tuple[int, set[int]]:
             )
 
             # Traiter les réalisateurs
-            director_str = movie_data.get("director", "")
-            if director_str and director_str != "Unknown Director":
-                for full_name in director_str.split("|"):
-                    full_name = full_name.strip()
-                    if " " in full_name:
-                        parts = full_name.split(" ", 1)
-                        director_id = generate_director_id(parts[0], parts[1])
-                        directors_to_insert[director_id] = {
-                            "id": director_id,
-                            "first_name": parts[0],
-                            "last_name": parts[1],
-                        }
-                        movie_directors_links.append(
-                            {"movie_id": movie_id, "director_id": director_id}
-                        )
+            director_rows, director_links = _build_director_rows(
+                movie_id, movie_data.get("director")
+            )
+            directors_to_insert.update((row["id"], row) for row in director_rows)
+            movie_directors_links.extend(director_links)
 
             # Traiter les langues
-            languages = movie_data.get("languages", [])
-            for lang in languages:
-                if isinstance(lang, dict):
-                    code = lang.get("code", "")
-                    label = lang.get("label", code)
-                elif isinstance(lang, str):
-                    code = lang
-                    label = lang
-                else:
-                    continue
-
-                if code:
-                    languages_to_insert[code] = {"code": code, "label": label}
-                    movie_languages_links.append({"movie_id": movie_id, "code": code})
+            language_rows, language_links = _build_language_rows(
+                movie_id, movie_data.get("languages")
+            )
+            languages_to_insert.update((row["code"], row) for row in language_rows)
+            movie_languages_links.extend(language_links)
+
+            # Date de sortie si disponible - seulement la première
+            releases = movie_data.get("releases") or []
+            if releases and releases[0].get("releaseDate"):
+                release = releases[0]
+                releases_to_insert[(movie_id, release["releaseDate"])] = {
+                    "movie_id": movie_id,
+                    "release_name": release.get("release_name", "Sortie française"),
+                    "release_date": release["releaseDate"],
+                }
 
         except Exception as e:
             logger.error(f"Erreur préparation film {movie_data.get('title')}: {e}")
@@ -349,48 +495,57 @@ def bulk_insert_movies(movies_data: list[dict]) -> tuple[int, set[int]]:
     inserted_count = 0
 
     try:
-        # 1. Insérer les films (ignorer les conflits)
-        for i in range(0, len(movies_to_insert), BATCH_SIZE):
-            batch = movies_to_insert[i : i + BATCH_SIZE]
-            result = supabase.table("movies").upsert(batch, on_conflict="id").execute()
-            inserted_count += len([m for m in result.data if m])
-            logger.info(f"Batch films {i//BATCH_SIZE + 1}: {len(batch)} films")
+        # 1. Insérer les films (merge: isPremiere, weeklyOuting, affiche... évoluent)
+        inserted = _upsert_in_batches("movies", movies_to_insert, on_conflict="id")
+        inserted_count = len([m for m in inserted if m])
 
         # 2. Insérer les réalisateurs
-        if directors_to_insert:
-            directors_list = list(directors_to_insert.values())
-            for i in range(0, len(directors_list), BATCH_SIZE):
-                batch = directors_list[i : i + BATCH_SIZE]
-                supabase.table("directors").upsert(batch, on_conflict="id").execute()
+        _upsert_in_batches(
+            "directors",
+            list(directors_to_insert.values()),
+            on_conflict="id",
+            returning=ReturnMethod.minimal,
+        )
 
         # 3. Insérer les langues
-        if languages_to_insert:
-            languages_list = list(languages_to_insert.values())
-            supabase.table("languages").upsert(
-                languages_list, on_conflict="code"
-            ).execute()
+        _upsert_in_batches(
+            "languages",
+            list(languages_to_insert.values()),
+            on_conflict="code",
+            returning=ReturnMethod.minimal,
+        )
 
         # 4. Créer les liens
-        if movie_directors_links:
-            for i in range(0, len(movie_directors_links), BATCH_SIZE):
-                batch = movie_directors_links[i : i + BATCH_SIZE]
-                supabase.table("movie_directors").upsert(
-                    batch, on_conflict="movie_id,director_id"
-                ).execute()
+        _upsert_in_batches(
+            "movie_directors",
+            movie_directors_links,
+            on_conflict="movie_id,director_id",
+            returning=ReturnMethod.minimal,
+        )
+        _upsert_in_batches(
+            "movie_languages",
+            movie_languages_links,
+            on_conflict="movie_id,code",
+            returning=ReturnMethod.minimal,
+        )
 
-        if movie_languages_links:
-            for i in range(0, len(movie_languages_links), BATCH_SIZE):
-                batch = movie_languages_links[i : i + BATCH_SIZE]
-                supabase.table("movie_languages").upsert(
-                    batch, on_conflict="movie_id,code"
-                ).execute()
+        # 5. Dates de sortie
+        _upsert_in_batches(
+            "releases",
+            list(releases_to_insert.values()),
+            on_conflict="movie_id,release_date",
+            returning=ReturnMethod.minimal,
+        )
+
+        # Tout est écrit: les prochains cinémas peuvent sauter ces films
+        _known_movie_ids.update(movie["id"] for movie in movies_to_insert)
 
         logger.info(f"Bulk insert terminé: {inserted_count} films insérés")
 
     except Exception as e:
         logger.error(f"Erreur lors du bulk insert: {e}")
 
-    return inserted_count, movie_ids
+    return inserted_count, movie_ids, movie_title_to_id
 
 
 def bulk_insert_screenings(screenings_data: list[dict], cinema_id: str) -> int:
@@ -402,7 +557,8 @@ def bulk_insert_screenings(screenings_data: list[dict], cinema_id: str) -> int:
         cinema_id: ID du cinéma (string, sera converti en BIGINT)
 
     Returns:
-        Nombre de séances insérées
+        Nombre de séances traitées (nouvelles ou déjà en base): un réimport
+        des mêmes séances ne doit pas ressembler à un échec
     """
     if not screenings_data:
         return 0
@@ -436,26 +592,34 @@ def bulk_insert_screenings(screenings_data: list[dict], cinema_id: str) -> int:
         except Exception as e:
             logger.error(f"Erreur préparation séance: {e}")
 
+    # Une seule ligne par clé de conflit (sinon ON CONFLICT DO UPDATE échoue),
+    # la dernière vue l'emporte, puis tri pour verrouiller dans le même ordre
+    # que les imports parallèles
+    on_conflict = "movie_id,cinema_id,date,starts_at"
+    columns = on_conflict.split(",")
+    unique_screenings = {
+        _conflict_sort_key(row, columns): row for row in screenings_to_insert
+    }
+    screenings_to_insert = [row for _, row in sorted(unique_screenings.items())]
+
     # Insérer par batch
-    inserted_count = 0
+    processed_count = 0
 
     try:
         for i in range(0, len(screenings_to_insert), BATCH_SIZE):
             batch = screenings_to_insert[i : i + BATCH_SIZE]
 
-            # Utiliser upsert pour éviter les erreurs de duplication
-            result = (
-                supabase.table("screenings")
-                .upsert(batch, on_conflict="movie_id,cinema_id,date,starts_at")
-                .execute()
-            )
+            # Merge: une version corrigée par Allocine (VF -> VOST) est réécrite
+            supabase.table("screenings").upsert(
+                batch, on_conflict=on_conflict, returning=ReturnMethod.minimal
+            ).execute()
 
-            inserted_count += len(result.data)
+            processed_count += len(batch)
 
     except Exception as e:
         logger.error(f"Erreur bulk insert screenings: {e}")
 
-    return inserted_count
+    return processed_count
 
 
 def process_cinema_screenings(cinema_id: str, date: str) -> tuple[int, int]:
@@ -468,37 +632,27 @@ def process_cinema_screenings(cinema_id: str, date: str) -> tuple[int, int]:
         date: Date in YYYY-MM-DD format
 
     Returns:
-        Tuple of (movies_inserted, screenings_inserted)
+        Tuple of (movies_upserted, screenings_processed), (0, 0) on error
     """
-    from allocineAPI.allocineAPI import allocineAPI
+    from services.allocine import get_allocine_api
 
     logger.info("Processing cinema screenings", cinema_id=cinema_id, date=date)
 
-    api = allocineAPI()
+    api = get_allocine_api()
 
     try:
-        # Get movies first
-        movies_data = api.get_movies(cinema_id, date)
-
-        # Bulk insert all movies at once!
-        movies_inserted, movie_ids_set = bulk_insert_movies(movies_data)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Showtimes don't depend on movies: fetch them while movies are inserted
+            showtimes_future = executor.submit(api.get_showtime, cinema_id, date)
 
-        # Create a mapping of movie titles to IDs
-        movie_title_to_id = {}
-        for movie_data in movies_data:
-            title = movie_data.get("title", "")
-            original_title = movie_data.get("originalTitle", title)
-            runtime = parse_runtime(movie_data.get("runtime", "0min"))
-            movie_id = generate_movie_id(title, original_title, runtime)
-            movie_title_to_id[title] = movie_id
+            # Get movies first
+            movies_data = api.get_movies(cinema_id, date)
 
-            # Insert release dates if available - only the first one
-            releases = movie_data.get("releases", [])
-            if releases and len(releases) > 0 and releases[0].get("releaseDate"):
-                insert_release(movie_id, releases[0])
+            # Bulk insert all movies (and their release dates) at once
+            movies_inserted, _, movie_title_to_id = bulk_insert_movies(movies_data)
 
-        # Now get the actual showtimes
-        showtimes_data = api.get_showtime(cinema_id, date)
+            # Now get the actual showtimes
+            showtimes_data = showtimes_future.result()
 
         # Prepare all screenings for bulk insert
         all_screenings = []
@@ -541,7 +695,6 @@ def process_cinema_screenings(cinema_id: str, date: str) -> tuple[int, int]:
         return 0, 0
 
 
-# Exposer seulement les fonctions publiques nécessaires
 __all__ = [
     "parse_runtime",
     "generate_movie_id",
@@ -18,8 +18,13 @@ class LazySupabaseClient:
     """Lazy loading wrapper for Supabase client."""
     
     def __getattr__(self, name):
+        # Appelé seulement tant que _client n'est pas encore posé sur l'instance
+        if name == "_client":
+            client = get_supabase_client()
+            object.__setattr__(self, "_client", client)
+            return client
         # Déléguer tous les appels au vrai client
-        return getattr(get_supabase_client(), name)
+        return getattr(self._client, name)
 
 
 # Instance unique utilisée partout
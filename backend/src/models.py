@@ -1,11 +1,12 @@
 """
 Data models for 35mm Paris.
-Simple Pydantic models for data validation.
+Pydantic models for API data validation, frozen slotted dataclasses for
+small value objects built by the parsers.
 """
 
-from typing import Any
+from dataclasses import dataclass
 
-from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class MovieData(BaseModel):
@@ -31,41 +32,28 @@ class MovieData(BaseModel):
             raise ValueError("Title cannot be empty")
         return v.strip()
 
-    @field_validator("originalTitle", mode="before")
-    @classmethod
-    def original_title_default(cls, v: Any, info: ValidationInfo) -> Any:
+    @model_validator(mode="after")
+    def original_title_default(self) -> "MovieData":
         """If no original title, use the main title."""
-        if not v:
-            return info.data.get("title", "")
-        return v
+        self.originalTitle = self.originalTitle or self.title
+        return self
 
 
-class Director(BaseModel):
-    """Director information."""
+@dataclass(slots=True, frozen=True)
+class Director:
+    """Director information (names are checked non-empty by parse_directors)."""
 
     first_name: str
     last_name: str
 
-    @field_validator("first_name", "last_name")
-    @classmethod
-    def names_not_empty(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("Name cannot be empty")
-        return v.strip()
 
-
-class Language(BaseModel):
-    """Language information."""
+@dataclass(slots=True, frozen=True)
+class Language:
+    """Language information (parse_languages defaults the label to the code)."""
 
     code: str
     label: str | None = None
 
-    @field_validator("label", mode="before")
-    @classmethod
-    def label_default(cls, v: Any, info: ValidationInfo) -> Any:
-        """If no label, use code as label."""
-        return v or info.data.get("code", "")
-
 
 class Cinema(BaseModel):
     """Cinema information."""
@@ -77,11 +65,12 @@ class Cinema(BaseModel):
     zipcode: str | None = None
 
 
-class Screening(BaseModel):
+@dataclass(slots=True, frozen=True)
+class Screening:
     """Movie screening information."""
 
     movie_id: int
     cinema_id: int
     date: str  # Format: YYYY-MM-DD
     starts_at: str | None = None  # Format: HH:MM
-    version: str | None = Field(None, alias="diffusion_version")
+    version: str | None = None  # Colonne diffusion_version
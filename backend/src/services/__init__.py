@@ -0,0 +1,3 @@
+from .allocine import get_allocine_api
+
+__all__ = ["get_allocine_api"]
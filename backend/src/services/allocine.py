@@ -0,0 +1,48 @@
+"""
+Allocine API client for 35mm Paris.
+One shared instance so every fetch reuses the same client and connections.
+"""
+
+import json
+from functools import lru_cache
+
+import requests
+from allocineAPI.allocineAPI import allocineAPI
+from requests.adapters import HTTPAdapter
+
+from config.settings import get_settings
+
+# Connexions gardées ouvertes vers Allocine (workers x fetch showtimes en parallèle)
+POOL_MAXSIZE = 20
+
+
+class PooledAllocineAPI(allocineAPI):
+    """
+    allocineAPI whose requests go through one keep-alive Session.
+
+    The upstream client calls requests.get() for every page, which opens a new
+    TCP + TLS connection each time. Each request is bounded by allocine_timeout
+    so one hung connection cannot block a worker for the rest of the run.
+    """
+
+    def __init__(self) -> None:
+        self.timeout = get_settings().allocine_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _get_json_request(self, path, url_params: dict | None = None) -> dict:
+        return json.loads(self._get_request(path, params=url_params))
+
+    def _get_request(self, path, params=None):
+        req = self.session.get(path, params=params, timeout=self.timeout)
+        if req.status_code != 200:
+            raise Exception("Error " + str(req.status_code))
+        return req.text
+
+
+@lru_cache(maxsize=1)
+def get_allocine_api() -> allocineAPI:
+    """Get or create Allocine API client (singleton pattern)."""
+    return PooledAllocineAPI()
@@ -0,0 +1,53 @@
+"""
+Tests for the shared Allocine API client.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services import allocine
+from services.allocine import PooledAllocineAPI, get_allocine_api
+
+
+@pytest.fixture
+def allocine_api(monkeypatch):
+    """Fixture providing a fresh singleton with a fake settings timeout."""
+    monkeypatch.setattr(
+        allocine, "get_settings", lambda: SimpleNamespace(allocine_timeout=7)
+    )
+    get_allocine_api.cache_clear()
+    yield get_allocine_api()
+    get_allocine_api.cache_clear()
+
+
+class TestGetAllocineApi:
+    """Test the Allocine client singleton."""
+
+    def test_get_allocine_api_singleton(self, allocine_api):
+        assert isinstance(allocine_api, PooledAllocineAPI)
+        assert get_allocine_api() is allocine_api
+
+    def test_requests_go_through_session(self, allocine_api, monkeypatch):
+        calls = []
+
+        def fake_get(path, **kwargs):
+            calls.append((path, kwargs))
+            return SimpleNamespace(status_code=200, text='{"results": []}')
+
+        monkeypatch.setattr(allocine_api.session, "get", fake_get)
+
+        assert allocine_api._get_json_request("https://x", {"page": 1}) == {
+            "results": []
+        }
+        assert calls == [("https://x", {"params": {"page": 1}, "timeout": 7})]
+
+    def test_request_error_status(self, allocine_api, monkeypatch):
+        monkeypatch.setattr(
+            allocine_api.session,
+            "get",
+            lambda path, **kwargs: SimpleNamespace(status_code=503, text=""),
+        )
+
+        with pytest.raises(Exception, match="Error 503"):
+            allocine_api._get_request("https://x")
@@ -3,9 +3,16 @@ Tests for database insertion logic.
 Updated to test BIGINT support for cinema IDs.
 """
 
+from collections import defaultdict
+from types import SimpleNamespace
+
 import pytest
+from postgrest import ReturnMethod
 
+from db import insert_logic
 from db.insert_logic import (
+    bulk_insert_movies,
+    bulk_insert_screenings,
     cinema_id_to_bigint,
     cinema_id_to_int,
     generate_circuit_id,
@@ -17,6 +24,58 @@ from db.insert_logic import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_id_caches():
+    """Clear the memoized ID generators and the known movies after each test."""
+    yield
+    for cached in (
+        insert_logic._hash_movie_id,
+        insert_logic._hash_director_id,
+        insert_logic._hash_circuit_id,
+        insert_logic.cinema_id_to_bigint,
+    ):
+        cached.cache_clear()
+    insert_logic._known_movie_ids.clear()
+
+
+class FakeTable:
+    """Supabase table stand-in: records upserted rows and echoes the batch back."""
+
+    def __init__(self, rows, returning):
+        self.rows = rows
+        self.returning = returning
+        self.batch = []
+
+    def upsert(self, batch, returning=ReturnMethod.representation, **kwargs):
+        self.rows.extend(batch)
+        self.returning.append(returning)
+        # Like PostgREST, return=minimal sends back an empty body
+        self.batch = [] if returning == ReturnMethod.minimal else batch
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=list(self.batch))
+
+
+class FakeSupabase:
+    """Supabase client stand-in keeping every upserted row per table."""
+
+    def __init__(self):
+        self.upserted = defaultdict(list)
+        self.returning = defaultdict(list)
+
+    def table(self, name):
+        return FakeTable(self.upserted[name], self.returning[name])
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    """Fixture replacing the Supabase client used by insert_logic."""
+    fake = FakeSupabase()
+    monkeypatch.setattr(insert_logic, "supabase", fake)
+    return fake
+
+
 class TestParseRuntime:
     """Test runtime parsing functionality."""
 
@@ -40,6 +99,14 @@ class TestParseRuntime:
     def test_parse_runtime_already_int(self):
         assert parse_runtime(120) == 120
 
+    def test_parse_runtime_surrounding_text(self):
+        # Same results as the original regex parser: the runtime feeds movie IDs
+        assert parse_runtime("Durée 1h 30min") == 90
+        assert parse_runtime("2h 5min extra") == 125
+        assert parse_runtime("45minutes") == 45
+        assert parse_runtime("1h 30min 2h") == 90
+        assert parse_runtime("1h30") == 60
+
 
 class TestGenerateIds:
     """Test ID generation functions."""
@@ -136,6 +203,12 @@ class TestParseHelpers:
         assert len(directors) == 1
         assert directors[0].first_name == "Christopher"
 
+    def test_parse_directors_extra_whitespace(self):
+        directors = parse_directors("Madonna  |  Jean-Pierre  Jeunet |")
+        assert len(directors) == 1
+        assert directors[0].first_name == "Jean-Pierre"
+        assert directors[0].last_name == "Jeunet"
+
     def test_parse_languages_dict_format(self):
         languages = parse_languages(
             [{"code": "fr", "label": "Français"}, {"code": "en", "label": "English"}]
@@ -168,6 +241,145 @@ class TestParseHelpers:
         assert languages[1].code == "en"
 
 
+class TestBulkInsertMovies:
+    """Test bulk movie insertion against a fake Supabase client."""
+
+    def test_bulk_insert_movies_mapping_and_releases(
+        self, fake_supabase, sample_movie_data
+    ):
+        dune = {
+            **sample_movie_data,
+            "releases": [
+                {"releaseDate": "2024-02-28"},
+                {"releaseDate": "2024-03-15"},  # Only the first one is kept
+            ],
+        }
+        matrix = {
+            "title": "The Matrix",
+            "runtime": "2h 16min",
+            "releases": [{"releaseDate": "1999-06-23"}],
+        }
+
+        inserted, movie_ids, title_to_id = bulk_insert_movies([dune, matrix, dune])
+
+        dune_id = generate_movie_id("Dune: Part Two", "Dune: Part Two", 166)
+        matrix_id = generate_movie_id("The Matrix", "The Matrix", 136)
+        assert title_to_id == {"Dune: Part Two": dune_id, "The Matrix": matrix_id}
+        assert movie_ids == {dune_id, matrix_id}
+        assert inserted == 2  # The duplicate Dune is sent once
+
+        releases = fake_supabase.upserted["releases"]
+        assert sorted((r["movie_id"], r["release_date"]) for r in releases) == sorted(
+            [(dune_id, "2024-02-28"), (matrix_id, "1999-06-23")]
+        )
+
+    def test_bulk_insert_movies_returning(self, fake_supabase, sample_movie_data):
+        movie = {**sample_movie_data, "releases": [{"releaseDate": "2024-02-28"}]}
+
+        inserted, _, _ = bulk_insert_movies([movie])
+
+        # movies_inserted comes from the returned rows: movies must keep them
+        assert inserted == 1
+        assert fake_supabase.returning["movies"] == [ReturnMethod.representation]
+        for table in (
+            "directors",
+            "languages",
+            "movie_directors",
+            "movie_languages",
+            "releases",
+        ):
+            assert fake_supabase.returning[table] == [ReturnMethod.minimal], table
+
+    def test_bulk_insert_movies_skips_known_movies(
+        self, fake_supabase, sample_movie_data
+    ):
+        movie = {**sample_movie_data, "releases": [{"releaseDate": "2024-02-28"}]}
+        bulk_insert_movies([movie])
+        tables = ("movies", "directors", "languages", "releases")
+        sent_first = {table: len(fake_supabase.upserted[table]) for table in tables}
+        assert sent_first == {
+            "movies": 1,
+            "directors": 1,
+            "languages": 2,
+            "releases": 1,
+        }
+
+        inserted, movie_ids, title_to_id = bulk_insert_movies([movie])
+
+        # Second call in the same run: nothing new is sent to Supabase
+        sent_second = {table: len(fake_supabase.upserted[table]) for table in tables}
+        assert sent_second == sent_first
+        movie_id = generate_movie_id("Dune: Part Two", "Dune: Part Two", 166)
+        assert inserted == 0
+        assert movie_ids == {movie_id}
+        assert title_to_id == {"Dune: Part Two": movie_id}
+
+    def test_bulk_insert_movies_rows_sorted_by_conflict_key(self, fake_supabase):
+        # Concurrent imports must lock shared rows in the same order
+        bulk_insert_movies(
+            [
+                {
+                    "title": "B",
+                    "director": "Ethan Coen | Joel Coen",
+                    "languages": ["fr", "en"],
+                },
+                {"title": "A", "director": "Agnès Varda", "languages": ["en", "de"]},
+            ]
+        )
+
+        for table, columns in (
+            ("movies", ["id"]),
+            ("directors", ["id"]),
+            ("languages", ["code"]),
+            ("movie_directors", ["movie_id", "director_id"]),
+            ("movie_languages", ["movie_id", "code"]),
+        ):
+            keys = [
+                tuple(row[c] for c in columns) for row in fake_supabase.upserted[table]
+            ]
+            assert keys == sorted(keys), table
+
+        codes = [row["code"] for row in fake_supabase.upserted["languages"]]
+        assert codes == ["de", "en", "fr"]
+
+
+class TestBulkInsertScreenings:
+    """Test bulk screening insertion against a fake Supabase client."""
+
+    def test_bulk_insert_screenings_reimport_counts_processed(self, fake_supabase):
+        screenings = [
+            {"movie_id": 1, "date": "2025-01-15", "time": "2025-01-15T14:00:00Z"},
+            {"movie_id": 1, "date": "2025-01-15", "time": "20:30:00", "version": "VO"},
+        ]
+
+        assert bulk_insert_screenings(screenings, "P3757") == 2
+        # Already in the database: still processed, not a failure
+        assert bulk_insert_screenings(screenings, "P3757") == 2
+
+        first = fake_supabase.upserted["screenings"][0]
+        assert first["cinema_id"] == cinema_id_to_bigint("P3757")
+        assert first["starts_at"] == "14:00:00"
+
+    def test_bulk_insert_screenings_dedupes_and_merges(self, fake_supabase):
+        screenings = [
+            {"movie_id": 2, "date": "2025-01-15", "time": "20:30:00", "version": "VF"},
+            {"movie_id": 1, "date": "2025-01-15", "time": "18:00:00"},
+            # Same screening listed again with a corrected version: last one wins
+            {
+                "movie_id": 2,
+                "date": "2025-01-15",
+                "time": "20:30:00",
+                "version": "VOST",
+            },
+        ]
+
+        assert bulk_insert_screenings(screenings, "P3757") == 2
+
+        sent = fake_supabase.upserted["screenings"]
+        assert [row["movie_id"] for row in sent] == [1, 2]  # Sorted by conflict key
+        assert sent[1]["diffusion_version"] == "VOST"
+
+
 @pytest.fixture
 def sample_movie_data():
     """Fixture providing sample movie data."""